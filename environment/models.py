@@ -1,7 +1,8 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
+from green_power_backend.validation import DictValidationMixin
 
-class EnvironmentDataModel(BaseModel):
+class EnvironmentDataModel(DictValidationMixin, BaseModel):
     pm1_0: int = Field(..., alias='pm1_0(ug/m3)')
     pm2_5: int = Field(..., alias='pm2_5(ug/m3)')
     pm10_0: int = Field(..., alias='pm10_0(ug/m3)')
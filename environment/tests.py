@@ -1,3 +1,55 @@
-from django.test import TestCase
+import json
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from environment.models import EnvironmentDataModel
+
+
+ALIASED_PAYLOAD = {
+    'pm1_0(ug/m3)': 12,
+    'pm2_5(ug/m3)': 18,
+    'pm10_0(ug/m3)': 25,
+    'hum(%)': 61.5,
+    'temp_1(*C)': 29.4,
+    'dp(*C)': 21,
+    'timestamp': '2025-07-14T10:00:00Z',
+}
+
+NAMED_PAYLOAD = {
+    'pm1_0': 12,
+    'pm2_5': 18,
+    'pm10_0': 25,
+    'humidity': 61.5,
+    'temp_1': 29.4,
+    'dew_point': 21,
+    'timestamp': '2025-07-14T10:00:00Z',
+}
+
+
+class EnvironmentDataValidationTests(SimpleTestCase):
+    def assertMatchesModelDump(self, payload):
+        validated, errors = EnvironmentDataModel.validate_into_json(payload)
+        self.assertEqual(errors, [])
+        self.assertEqual(
+            json.loads(validated),
+            EnvironmentDataModel(**payload).model_dump(mode='json')
+        )
+
+    def test_aliased_payload_matches_model_dump(self):
+        self.assertMatchesModelDump(ALIASED_PAYLOAD)
+
+    def test_named_payload_matches_model_dump(self):
+        self.assertMatchesModelDump(NAMED_PAYLOAD)
+
+    def test_extra_keys_are_dropped(self):
+        self.assertMatchesModelDump({**ALIASED_PAYLOAD, 'device': 'ENV_01'})
+
+    def test_invalid_payload_returns_errors(self):
+        payload = {**ALIASED_PAYLOAD, 'pm2_5(ug/m3)': 'high'}
+        payload.pop('hum(%)')
+
+        validated, errors = EnvironmentDataModel.validate_into_json(payload)
+
+        self.assertIsNone(validated)
+        self.assertEqual([loc for loc, _ in errors], [('pm2_5(ug/m3)',), ('hum(%)',)])
+        self.assertTrue(all(isinstance(msg, str) for _, msg in errors))
@@ -1,22 +1,20 @@
-from pydantic import BaseModel, Field, RootModel
+from pydantic import BaseModel, Field, PrivateAttr
 from typing import Union, Dict
 
-class GeneratorPayload(RootModel[Dict[str, Union[int, float, str]]]):
-    pass
-
 
 class GeneratorDataModel(BaseModel):
     timestamp: int = Field(..., ge=0, description="Unix timestamp in milliseconds")
-    payload: GeneratorPayload
+    _payload: Dict[str, Union[int, float, str]] = PrivateAttr(default_factory=dict)
 
-    def model_dump(self, *args, **kwargs):
-        base = super().model_dump(*args, **kwargs)
+    def to_document(self) -> Dict[str, Union[int, float, str]]:
+        # Only the timestamp is validated; the point values are passed through as-is
         return {
-            "timestamp": base["timestamp"],
-            **base["payload"]
+            "timestamp": self.timestamp,
+            **self._payload
         }
 
     @classmethod
     def from_flat_dict(cls, data: Dict[Union[int, str], Union[int, float, str]]):
-        ts = data.pop("timestamp", None)
-        return cls(timestamp=ts, payload=GeneratorPayload(data))
\ No newline at end of file
+        model = cls(timestamp=data.get("timestamp"))
+        model._payload = {key: value for key, value in data.items() if key != "timestamp"}
+        return model
\ No newline at end of file
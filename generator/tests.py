@@ -1,3 +1,24 @@
-from django.test import TestCase
+from django.test import SimpleTestCase
+from pydantic import ValidationError
 
-# Create your tests here.
+from generator.models import GeneratorDataModel
+
+
+class GeneratorDataModelTests(SimpleTestCase):
+    def test_to_document_keeps_points(self):
+        data = {"timestamp": 1752487200000, "device_id": "GEN_01", "1": 230.5, "2": 7}
+
+        model = GeneratorDataModel.from_flat_dict(data)
+
+        self.assertEqual(model.to_document(), data)
+        self.assertEqual(data["device_id"], "GEN_01")  # input is left untouched
+
+    def test_model_dump_covers_declared_fields_only(self):
+        model = GeneratorDataModel.from_flat_dict({"timestamp": 1752487200000, "1": 230.5})
+
+        self.assertEqual(model.model_dump(), {"timestamp": 1752487200000})
+        self.assertEqual(model.model_dump_json(), '{"timestamp":1752487200000}')
+
+    def test_invalid_timestamp(self):
+        with self.assertRaises(ValidationError):
+            GeneratorDataModel.from_flat_dict({"timestamp": -1, "1": 230.5})
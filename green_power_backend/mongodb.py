@@ -1,50 +1,61 @@
-from pymongo import MongoClient, errors
+from functools import lru_cache
+from pymongo import MongoClient, WriteConcern, errors
+from pymongo.database import Database
 from django.conf import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
-class MongoDBClient:
-    _client = None
-    _db = None
-
-    @classmethod
-    def connect(cls):
-        if cls._client and cls._db:
-            return cls._db  # Already connected
-        
-        try:
-            mongo_uri = getattr(settings, 'MONGO_DB_URI')
-            db_name = getattr(settings, 'MONGO_DB_NAME')
-
-            if not mongo_uri or not db_name:
-                raise ValueError("MongoDB URI or DB name not set in settings.")
-
-            cls._client = MongoClient(mongo_uri, serverSelectionTimeoutMS=3000)
-            cls._client.admin.command('ping')  # Test connection
-            cls._db = cls._client[db_name]
-
-            logger.info(f"[MongoDB] Connected to database: {db_name}")
-            return cls._db
-        except (errors.ConnectionFailure, errors.ServerSelectionTimeoutError) as e:
-            logger.critical(f"[MongoDB] Connection failed: {e}")
-        except Exception as e:
-            logger.critical(f"[MongoDB] Unexpected error during connection: {e}")
-
-        cls._client = None
-        cls._db = None
-        return None
-    
-    @classmethod
-    def get_db(cls):
-        if cls._db is None:
-            cls.connect()
-        return cls._db
-    
-    @classmethod
-    def reconnect(cls):
-        logger.info("[MongoDB] Attempting reconnection...")
-        cls._client = None
-        cls._db = None
-        return cls.connect()
-
+UNACKNOWLEDGED = WriteConcern(w=0)
+
+
+@lru_cache(maxsize=1)
+def get_client() -> MongoClient:
+    """
+    Builds the process-wide MongoClient on first use; later calls reuse it.
+    """
+    mongo_uri = getattr(settings, 'MONGO_DB_URI')
+    if not mongo_uri:
+        raise ValueError("MongoDB URI not set in settings.")
+
+    return MongoClient(
+        mongo_uri,
+        serverSelectionTimeoutMS=3000,
+        maxPoolSize=200,
+        minPoolSize=getattr(settings, 'MONGO_MIN_POOL_SIZE', 0),
+        maxIdleTimeMS=60000,
+        retryWrites=False,
+        compressors='zstd,zlib',
+        zlibCompressionLevel=3,  # zlib is only the fallback for servers without zstd
+    )
+
+
+@lru_cache(maxsize=1)
+def get_db() -> Database:
+    """
+    Returns the configured database; the client is only built on first call.
+    """
+    return get_client()[settings.MONGO_DB_NAME]
+
+
+@lru_cache(maxsize=None)
+def get_collection(name: str):
+    """
+    Returns a cached fire-and-forget (w=0) handle for the collection.
+    """
+    return get_db().get_collection(name, write_concern=UNACKNOWLEDGED)
+
+
+def ping() -> bool:
+    """
+    Checks once that the server is reachable and logs the outcome.
+    """
+    try:
+        get_client().admin.command('ping')
+        logger.info(f"[MongoDB] Connected to database: {get_db().name}")
+        return True
+    except (errors.ConnectionFailure, errors.ServerSelectionTimeoutError) as e:
+        logger.critical(f"[MongoDB] Connection failed: {e}")
+    except Exception as e:
+        logger.critical(f"[MongoDB] Unexpected error during connection: {e}")
+    return False
@@ -7,11 +7,10 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(BASE_DIR))  # Add project root to sys.path
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "green_power_backend.settings")
 
-from green_power_backend.mongodb import MongoDBClient  
+from green_power_backend.mongodb import ping
 
 def main():
-    db = MongoDBClient.get_db()
-    if db is not None:
+    if ping():
         print("✅ MongoDB connected.")
     else:
         print("❌ MongoDB connection failed.")
@@ -122,6 +122,9 @@ MONGO_DB_PORT = os.getenv('MONGO_DB_PORT', '27017')
 MONGO_DB_NAME = os.getenv('MONGO_DB_NAME', 'test')
 MONGO_DB_USER = os.getenv("MONGO_DB_USER")
 MONGO_DB_PASSWORD = os.getenv("MONGO_DB_PASSWORD")
+# Connections kept open while idle; only the MQTT subscriber and solar TCP server,
+# which write continuously, raise it
+MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', 0))
 
 if MONGO_DB_USER and MONGO_DB_PASSWORD:
     MONGO_DB_URI = f"mongodb://{MONGO_DB_USER}:{MONGO_DB_PASSWORD}@{MONGO_DB_HOST}:{MONGO_DB_PORT}/?authSource=admin"
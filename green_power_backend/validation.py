@@ -0,0 +1,39 @@
+from functools import lru_cache
+from typing import Annotated, Any, Dict, List, Optional, Tuple
+from typing_extensions import TypedDict
+from pydantic import TypeAdapter, ValidationError
+
+
+@lru_cache(maxsize=None)
+def _dict_adapter(model_cls) -> TypeAdapter:
+    """
+    Compiles a TypedDict mirror of the model's fields once per model class.
+    """
+    schema = TypedDict(
+        f"{model_cls.__name__}Dict",
+        {name: Annotated[field.annotation, field] for name, field in model_cls.model_fields.items()}
+    )
+    schema.__pydantic_config__ = model_cls.model_config
+    return TypeAdapter(schema)
+
+
+class DictValidationMixin:
+    """
+    Validates payloads straight into JSON, skipping model instantiation.
+    """
+
+    @classmethod
+    def validate_into_json(
+        cls, data: Dict[str, Any]
+    ) -> Tuple[Optional[str], List[Tuple[Tuple, str]]]:
+        """
+        Returns the validated payload serialized straight to a JSON string and an
+        empty error list, or None and a list of (location, message) tuples when
+        validation fails.
+        """
+        adapter = _dict_adapter(cls)
+        try:
+            validated = adapter.validate_python(data)
+        except ValidationError as e:
+            return None, [(err['loc'], err['msg']) for err in e.errors()]
+        return adapter.dump_json(validated).decode(), []
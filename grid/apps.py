@@ -1,9 +1,9 @@
 from django.apps import AppConfig
-from green_power_backend.mongodb import MongoDBClient
+from green_power_backend.mongodb import ping
 
 class GridConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'grid'
 
     def ready(self):
-        MongoDBClient.connect()
+        ping()
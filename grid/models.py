@@ -1,7 +1,8 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
+from green_power_backend.validation import DictValidationMixin
 
-class RTDataModel(BaseModel):
+class RTDataModel(DictValidationMixin, BaseModel):
     device_id: str
     timestamp: datetime
     ua: float
@@ -50,7 +51,7 @@ class RTDataModel(BaseModel):
     qdm: float
     sdm: float
 
-class ENYNowDataModel(BaseModel):
+class ENYNowDataModel(DictValidationMixin, BaseModel):
     device_id: str
     zygsz: float
     fygsz: float
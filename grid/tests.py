@@ -1,3 +1,60 @@
-from django.test import TestCase
+import json
 
-# Create your tests here.
+from django.test import SimpleTestCase
+from pydantic import ValidationError
+
+from grid.models import RTDataModel, ENYNowDataModel
+
+
+def sample_payload(model_cls, by_alias=True):
+    """Builds a valid payload for every field, keyed by alias or by field name."""
+    payload = {}
+    for name, field in model_cls.model_fields.items():
+        key = (field.alias or name) if by_alias else name
+        if field.annotation is float:
+            payload[key] = 230.5
+        elif field.annotation is int:
+            payload[key] = 7
+        else:
+            payload[key] = '1'
+    if 'timestamp' in model_cls.model_fields:
+        payload['timestamp'] = '2025-07-14T10:00:00Z'
+    return payload
+
+
+class GridDataValidationTests(SimpleTestCase):
+    def assertMatchesModelDump(self, model_cls, payload):
+        validated, errors = model_cls.validate_into_json(payload)
+        self.assertEqual(errors, [])
+        self.assertEqual(json.loads(validated), model_cls(**payload).model_dump(mode='json'))
+
+    def test_rt_data_aliased_payload_matches_model_dump(self):
+        self.assertMatchesModelDump(RTDataModel, sample_payload(RTDataModel))
+
+    def test_rt_data_rejects_field_names_for_aliased_fields(self):
+        # RTDataModel does not enable validate_by_name, so "u_plus" is not accepted for "u+"
+        payload = sample_payload(RTDataModel, by_alias=False)
+        with self.assertRaises(ValidationError):
+            RTDataModel(**payload)
+
+        validated, errors = RTDataModel.validate_into_json(payload)
+
+        self.assertIsNone(validated)
+        self.assertEqual([loc for loc, _ in errors], [('u+',), ('u-',), ('i+',), ('i-',)])
+
+    def test_eny_now_named_payload_matches_model_dump(self):
+        self.assertMatchesModelDump(ENYNowDataModel, sample_payload(ENYNowDataModel, by_alias=False))
+
+    def test_extra_keys_are_dropped(self):
+        self.assertMatchesModelDump(ENYNowDataModel, {**sample_payload(ENYNowDataModel), 'extra': 1})
+
+    def test_invalid_payload_returns_errors(self):
+        payload = {**sample_payload(ENYNowDataModel), 'dmpmaxoct': 'n/a'}
+
+        validated, errors = ENYNowDataModel.validate_into_json(payload)
+
+        self.assertIsNone(validated)
+        self.assertEqual(len(errors), 1)
+        loc, msg = errors[0]
+        self.assertEqual(loc, ('dmpmaxoct',))
+        self.assertIsInstance(msg, str)
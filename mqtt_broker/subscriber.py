@@ -1,19 +1,22 @@
 import os
 import sys
+import asyncio
 import json
+import orjson
 import logging
 import time
 import signal
 import threading
 import django
+from collections import deque
+from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
 from paho.mqtt import client as mqtt_client
-from queue import Queue, Full, Empty
 from datetime import datetime, timezone
 from pydantic import ValidationError
-from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
 
 # ─────── Load Environment Variables ───────
@@ -23,6 +26,7 @@ load_dotenv()
 BASE_DIR = Path(__file__).resolve().parent.parent
 sys.path.append(str(BASE_DIR))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'green_power_backend.settings')
+os.environ.setdefault('MONGO_MIN_POOL_SIZE', '50')  # keep connections warm for bursts
 
 try:
     django.setup()
@@ -30,7 +34,7 @@ except Exception:
     logging.exception("Failed to set up Django")
     sys.exit(1)
 
-from green_power_backend.mongodb import MongoDBClient
+from green_power_backend.mongodb import get_db, get_collection
 from grid.models import RTDataModel, ENYNowDataModel
 from generator.models import GeneratorDataModel
 from environment.models import EnvironmentDataModel
@@ -38,8 +42,8 @@ from environment.models import EnvironmentDataModel
 # ─────── Constants ───────
 DEFAULT_RECONNECT_DELAY = 1
 MAX_RECONNECT_DELAY = 60
-QUEUE_TIMEOUT = 1
-QUEUE_MAX_SIZE = 1000
+INSERT_BATCH_SIZE = 200
+INSERT_FLUSH_INTERVAL = 0.5  # seconds
 
 TOPIC_MAPPING = {
     "MQTT_RT_DATA": (RTDataModel, "grid_rt_data"),
@@ -51,6 +55,18 @@ GEN_TOPIC = "CCCL/PURBACHAL/ENM_01"
 GEN_COLLECTION = "generator_data"
 ENV_COLLECTION = "environment_data"
 REALTIME_GROUP = "realtime_updates"
+UTC = timezone.utc
+
+# Generator point ids are small ints; pre-stringify them once instead of per message
+POINT_ID_LUT_SIZE = 1024
+POINT_ID_KEYS = {i: str(i) for i in range(POINT_ID_LUT_SIZE)}
+
+
+def point_key(point_id) -> str:
+    """Same key as str(point_id); plain ints inside the table skip the conversion."""
+    if type(point_id) is int and 0 <= point_id < POINT_ID_LUT_SIZE:
+        return POINT_ID_KEYS[point_id]
+    return str(point_id)
 
 # ─────── log Setup ───────
 log = logging.getLogger('subscriber')
@@ -63,51 +79,76 @@ if not log.hasHandlers():
     )
 
 # ─────── MQTT Configuration ───────
+@dataclass(frozen=True, slots=True)
 class MQTTConfig:
     """
-    Loads and stores MQTT broker configuration from environment variables.
+    Immutable MQTT broker configuration, loaded once from environment variables.
     """
+    broker: str
+    port: int
+    username: Optional[str]
+    password: Optional[str]
+    keepalive: int
+    topics: List[str]
+
+    @classmethod
+    def load(cls) -> 'MQTTConfig':
+        return cls(
+            broker=os.getenv('MQTT_BROKER', 'localhost'),
+            port=int(os.getenv('MQTT_PORT', 1883)),
+            username=os.getenv('MQTT_USERNAME'),
+            password=os.getenv('MQTT_PASSWORD'),
+            keepalive=int(os.getenv('MQTT_KEEPALIVE', 60)),
+            topics=cls._parse_topics(os.getenv('MQTT_TOPICS', '[]')),
+        )
 
-    def __init__(self):
-        self.broker: str = os.getenv('MQTT_BROKER', 'localhost')
-        self.port: int = int(os.getenv('MQTT_PORT', 1883))
-        self.username: str = os.getenv('MQTT_USERNAME')
-        self.password: str = os.getenv('MQTT_PASSWORD')
-        self.keepalive: int = int(os.getenv('MQTT_KEEPALIVE', 60))
-        self.topics: List[str] = self._parse_topics(os.getenv('MQTT_TOPICS', '[]'))
-
-        # log.info(
-        #     f"[MQTTConfig] Initialized: broker={self.broker}, port={self.port}, "
-        #     f"keepalive={self.keepalive}, topics={self.topics}"
-        # )
-
-    def _parse_topics(self, topics_str: str) -> List[str]:
+    @staticmethod
+    def _parse_topics(topics_str: str) -> List[str]:
         """
         Parses a JSON-formatted list of strings representing MQTT topics.
         """
         try:
-            topics = json.loads(topics_str)
-            if isinstance(topics, list) and all(isinstance(t, str) for t in topics):
+            topics = orjson.loads(topics_str)
+            if isinstance(topics, list) and all(type(t) is str for t in topics):
                 return topics
-        except (json.JSONDecodeError, TypeError):
+        except (orjson.JSONDecodeError, TypeError):
             log.exception("Failed to parse MQTT_TOPICS.")
 
         log.error("Invalid MQTT_TOPICS format. Must be a JSON array of strings.")
         return []
 
 
+CONFIG = MQTTConfig.load()
+
+
 # ─────── MQTT Subscriber ───────
 class MQTTSubscriber:
-    def __init__(self, config: MQTTConfig):
+    __slots__ = (
+        'config', 'client', 'connected', 'should_reconnect', 'reconnect_delay',
+        'session_data', 'mongodb', 'channel_layer', '_loop', 'fast_insert',
+        'insert_buffers', 'flush_event', 'flusher_running', '_dispatch',
+    )
+
+    def __init__(self, config: MQTTConfig, fast_insert: bool = True):
         self.config = config
         self.client = self._init_mqtt_client()
         self.connected = False
         self.should_reconnect = True
         self.reconnect_delay = DEFAULT_RECONNECT_DELAY
-        self.message_queue = Queue(maxsize=QUEUE_MAX_SIZE)
         self.session_data: Dict[str, Dict[str, Any]] = {}
-        self.mongodb = MongoDBClient().get_db()
+        self.mongodb = get_db()
         self.channel_layer = get_channel_layer()
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        self.fast_insert = fast_insert
+        self.insert_buffers: Dict[str, deque] = {}
+        self.flush_event = threading.Event()
+        self.flusher_running = False
+        self._dispatch = {
+            ENV_TOPIC: self._handle_env_data,
+            GEN_TOPIC: self._handle_generator_data,
+            **{topic: self._handle_grid_data for topic in TOPIC_MAPPING},
+        }
 
     def _init_mqtt_client(self) -> mqtt_client.Client:
         client = mqtt_client.Client(
@@ -148,13 +189,15 @@ class MQTTSubscriber:
 
     def _on_message(self, client, userdata, msg):
         try:
-            payload = json.loads(msg.payload.decode())
-            log.info(f"Received message on topic '{msg.topic}': {payload}")
-            self.message_queue.put_nowait((msg.topic, payload))
+            try:
+                payload = orjson.loads(msg.payload)
+            except orjson.JSONDecodeError:
+                # orjson rejects the NaN/Infinity literals that json has always accepted
+                payload = json.loads(msg.payload)
+            log.info("Received message on topic '%s': %s", msg.topic, payload)
+            self._handle_message(msg.topic, payload)
         except json.JSONDecodeError:
-            log.error(f"Invalid JSON in message from topic '{msg.topic}'")
-        except Full:
-            log.error("Message queue is full; dropping incoming message.")
+            log.error("Invalid JSON in message from topic '%s'", msg.topic)
         except Exception as e:
             log.exception(f"Unexpected error handling message: {e}")
 
@@ -169,33 +212,89 @@ class MQTTSubscriber:
                 log.error(f"Reconnect failed: {e}")
             self.reconnect_delay = min(self.reconnect_delay * 2, MAX_RECONNECT_DELAY)
 
-    def _send_realtime_data(self, topic: str, data: Dict[str, Any]) -> None:
+    def _send_realtime_data(self, topic: str, payload_json: str) -> None:
+        # Fire-and-forget onto the long-lived loop; the outcome is logged from the callback
         try:
-            async_to_sync(self.channel_layer.group_send)(
-                REALTIME_GROUP,
-                {
-                    'type': 'send.update',
-                    'data': {
+            future = asyncio.run_coroutine_threadsafe(
+                self.channel_layer.group_send(
+                    REALTIME_GROUP,
+                    {
+                        'type': 'send.update',
                         'topic': topic,
-                        'payload': data,
+                        'payload_json': payload_json,
                     }
-                }
+                ),
+                self._loop
             )
-            log.info(f"Message successfully broadcast to group '{REALTIME_GROUP}' on topic '{topic}'")
+            future.add_done_callback(partial(self._on_broadcast_done, topic))
         except Exception as e:
-            log.error(f"WebSocket push failed: {e}")
+            log.error("WebSocket push failed: %s", e)
+
+    def _on_broadcast_done(self, topic: str, future) -> None:
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            log.error("WebSocket push failed: %s", error)
+        else:
+            log.debug("Message successfully broadcast to group '%s' on topic '%s'", REALTIME_GROUP, topic)
+
+    # ─────── MongoDB Batching ───────
+    def _enqueue(self, collection: str, doc: Dict[str, Any]) -> None:
+        """
+        Buffers a document for the background flusher, or inserts it
+        immediately when fast_insert is disabled.
+        """
+        if not self.fast_insert:
+            self.mongodb[collection].insert_one(doc)
+            return
+
+        buffer = self.insert_buffers.setdefault(collection, deque())
+        buffer.append(doc)
+        if len(buffer) >= INSERT_BATCH_SIZE:
+            self.flush_event.set()
+
+    def flush(self) -> None:
+        """
+        Drains every buffer with unacknowledged, unordered insert_many calls.
+        """
+        for collection, buffer in list(self.insert_buffers.items()):
+            batch = []
+            while buffer:
+                try:
+                    batch.append(buffer.popleft())
+                except IndexError:
+                    break
+
+            if not batch:
+                continue
+
+            try:
+                get_collection(collection).insert_many(batch, ordered=False)
+            except Exception as e:
+                log.error("Batch insert of %d documents into %s failed: %s", len(batch), collection, e)
+
+    def _flush_periodically(self):
+        while self.flusher_running:
+            self.flush_event.wait(INSERT_FLUSH_INTERVAL)
+            self.flush_event.clear()
+            self.flush()
 
     # ─────── Message Handling ───────
     def _handle_env_data(self, topic: str, payload: Dict[str, Any]):
-        payload['timestamp'] = datetime.now(timezone.utc)
+        payload['timestamp'] = datetime.now(UTC)
         
         try:
-            validated = EnvironmentDataModel(**payload)
-            self.mongodb[ENV_COLLECTION].insert_one(payload.copy())
-            log.info(f"{topic} inserted into MongoDB")
-            self._send_realtime_data(topic, validated.model_dump(mode="json"))  # Only pushed if insert succeeds
+            validated, errors = EnvironmentDataModel.validate_into_json(payload)
+            if errors:
+                log.error("%s validation failed: %s", topic, errors)
+                return
+
+            self._enqueue(ENV_COLLECTION, payload)
+            log.debug("%s queued for MongoDB insert", topic)
+            self._send_realtime_data(topic, validated)  # Broadcast now; the insert is flushed later
         except Exception as e:
-            log.error(f"{topic} insert or validation failed: {e}")
+            log.error("%s insert or validation failed: %s", topic, e)
 
     def _handle_generator_data(self, topic: str, payload: Dict[str, Any]):
         session = self.session_data.setdefault(topic, {})
@@ -206,7 +305,7 @@ class MQTTSubscriber:
                 return
 
             timestamp = data_point.get("tp")
-            points = {str(p["id"]): p["val"] for p in data_point.get("point", [])}
+            points = {point_key(p["id"]): p["val"] for p in data_point.get("point", [])}
             doc = {"timestamp": timestamp, **points}
 
             if session.get("timestamp") == timestamp:
@@ -218,19 +317,19 @@ class MQTTSubscriber:
                 try:
                     validated = GeneratorDataModel.from_flat_dict(data_to_insert)
                 except ValidationError as ve:
-                    log.error(f"Validation error for topic {topic}: {ve}")
+                    log.error("Validation error for topic %s: %s", topic, ve)
                     session.clear()
                     return
 
-                self.mongodb[GEN_COLLECTION].insert_one(data_to_insert)
-                log.info(f"{topic} inserted into MongoDB.")
-                self._send_realtime_data(topic, validated.model_dump(mode='json'))
+                self._enqueue(GEN_COLLECTION, data_to_insert)
+                log.debug("%s queued for MongoDB insert", topic)
+                self._send_realtime_data(topic, orjson.dumps(validated.to_document()).decode())
                 session.clear()
             else:
                 session.update(doc)
 
         except Exception as e:
-            log.error(f"{topic} insert or processing error: {e}")
+            log.error("%s insert or processing error: %s", topic, e)
             session.clear()
 
 
@@ -242,44 +341,35 @@ class MQTTSubscriber:
         if payload.get('isend') == '1':
             try:
                 session['device_id'] = session.pop('id')
-                session['timestamp'] = datetime.now(timezone.utc)
-                validated = model_class(**session)
-                self.mongodb[collection].insert_one(session.copy())
-                log.info(f"{topic} inserted into MongoDB.")
-                self._send_realtime_data(topic, validated.model_dump(mode='json'))
-            except ValidationError as ve:
-                log.error(f"{topic} validation failed: {ve}")
+                session['timestamp'] = datetime.now(UTC)
+                validated, errors = model_class.validate_into_json(session)
+                if errors:
+                    log.error("%s validation failed: %s", topic, errors)
+                    return
+
+                self._enqueue(collection, session)
+                log.debug("%s queued for MongoDB insert", topic)
+                self._send_realtime_data(topic, validated)
             except Exception as e:
-                log.error(f"{topic} insert failed: {e}")
+                log.error("%s insert failed: %s", topic, e)
             finally:
-                session.clear()
+                # Hand the finished session off to the insert buffer and start a fresh one
+                self.session_data[topic] = {}
 
     def _handle_message(self, topic: str, payload: Dict[str, Any]):
-        if topic in TOPIC_MAPPING:
-            self._handle_grid_data(topic, payload)
-        elif topic == ENV_TOPIC:
-            self._handle_env_data(topic, payload)
-        elif topic == GEN_TOPIC:
-            self._handle_generator_data(topic, payload)
-        else:
-            log.warning(f"Unhandled topic: {topic}")
-
-    def _process_queue(self):
-        while True:
-            try:
-                topic, payload = self.message_queue.get(timeout=QUEUE_TIMEOUT)
-                self._handle_message(topic, payload)
-            except Empty:
-                continue
-            except Exception as e:
-                log.error(f"Queue processing error: {e}")
-
+        handler = self._dispatch.get(topic)
+        if handler is None:
+            log.warning("Unhandled topic: %s", topic)
+            return
+        handler(topic, payload)
 
     def connect(self):
         try:
             self.client.connect_async(self.config.broker, self.config.port, self.config.keepalive)
             self.client.loop_start()
-            threading.Thread(target=self._process_queue, daemon=True).start()
+            if self.fast_insert:
+                self.flusher_running = True
+                threading.Thread(target=self._flush_periodically, daemon=True).start()
             log.info("MQTT Subscriber started.")
         except Exception as e:
             log.exception("Initial connection failed.")
@@ -289,11 +379,15 @@ class MQTTSubscriber:
         self.should_reconnect = False
         self.client.disconnect()
         self.client.loop_stop()
+        self.flusher_running = False
+        self.flush_event.set()
+        self.flush()
+        self._loop.call_soon_threadsafe(self._loop.stop)
         log.info("MQTT Subscriber stopped.")
 
 
 def main():
-    subscriber = MQTTSubscriber(MQTTConfig())
+    subscriber = MQTTSubscriber(CONFIG)
 
     def shutdown_handler(signum, frame):
         log.info("Shutting down gracefully...")
@@ -1,5 +1,5 @@
 from channels.generic.websocket import AsyncWebsocketConsumer
-import json
+import orjson
 
 class RealtimeConsumer(AsyncWebsocketConsumer):
     async def connect(self):
@@ -10,4 +10,5 @@ class RealtimeConsumer(AsyncWebsocketConsumer):
         await self.channel_layer.group_discard('realtime_updates', self.channel_name)
 
     async def send_update(self, event):
-        await self.send(text_data=json.dumps(event['data']))
\ No newline at end of file
+        topic = orjson.dumps(event['topic']).decode()
+        await self.send(text_data=f'{{"topic":{topic},"payload":{event["payload_json"]}}}')
\ No newline at end of file
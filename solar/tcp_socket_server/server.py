@@ -1,22 +1,28 @@
+import asyncio
 import itertools
 import threading
 import socket
 import struct
+import time
 import logging
+import queue
+import multiprocessing
 import pymongo
-import pytz
+import signal
 import sys
 import os
-from typing import List, Tuple, Dict
-from datetime import datetime
+from typing import List, Set
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
 # Configure Django settings
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 sys.path.insert(0, str(BASE_DIR))  # Add project root to sys.path
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "green_power_backend.settings")
+os.environ.setdefault("MONGO_MIN_POOL_SIZE", "50")  # keep connections warm for bursts
 
-from green_power_backend.mongodb import MongoDBClient
+from green_power_backend.mongodb import get_client, get_db, get_collection
 
 # Constants
 HEARTBEAT_PACKET: bytes = b'GWCCCL0001'
@@ -25,15 +31,77 @@ RESPONSE_PACKETS: List[bytes] = [
     bytes.fromhex("01 6E 00 00 00 06 01 03 0B ED 00 06"),
     bytes.fromhex("01 B6 00 00 00 06 01 03 0C 83 00 08"),
 ]
+# "Today" and "this month" are served by timestamp range queries on this collection
+SOLAR_COLLECTION: str = 'solar_data'
 RECV_BUFFER_SIZE: int = 1024
 CLIENT_TIMEOUT: int = 120  # seconds
+LISTEN_BACKLOG: int = 512  # absorbs reconnect storms after a network blip
+BATCH_SIZE: int = 50  # samples buffered before an early flush
+FLUSH_INTERVAL: int = 2  # seconds
+# Accept-loop processes sharing the port through SO_REUSEPORT; opt-in, since each
+# worker opens its own MongoDB connection pool
+WORKERS: int = int(os.getenv('SOLAR_TCP_WORKERS', 1))
+WORKER_SHUTDOWN_TIMEOUT: int = 10  # seconds a terminated worker gets to flush before it is killed
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='[%(asctime)s] [%(levelname)s] %(message)s',
+# Register decoders, compiled once and indexed like RESPONSE_PACKETS:
+#   #0 reads 10 registers from 3000 (currents)      -> 5 x FLOAT32
+#   #1 reads 6 registers from 3054 (active power)   -> 3 x FLOAT32
+#   #2 reads 8 registers from 3204 (active energy)  -> 2 x INT64 (Wh), not register pairs
+FLOAT_STRUCT = struct.Struct('!f')
+INT64_STRUCT = struct.Struct('!q')
+RESPONSE_DECODERS = (FLOAT_STRUCT, FLOAT_STRUCT, INT64_STRUCT)
+MODBUS_READ_HEADER: bytes = b'\x01\x03'  # unit id 1, function 0x03 (read holding registers)
+MODBUS_HEADER_OFFSET: int = 6  # after the MBAP transaction id, protocol id and length
+
+# Configure logging: records are queued and written to stdout by a listener thread,
+# so connection handlers never block on the stream handler's lock
+LOG_QUEUE: queue.Queue = queue.Queue(-1)
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(logging.Formatter(
+    '[%(asctime)s] [%(levelname)s] %(message)s',
     datefmt='%Y-%m-%d %H:%M:%S'
-)
+))
+_queue_handler = QueueHandler(LOG_QUEUE)
+log_listener = QueueListener(LOG_QUEUE, _stream_handler)
+
+
+def start_logging() -> bool:
+    """Route root logging through LOG_QUEUE, unless the caller configured logging.
+
+    Returns True when the listener was started here and should be stopped by the caller.
+    """
+    if logging.root.handlers:
+        return False
+    logging.root.setLevel(logging.INFO)
+    logging.root.addHandler(_queue_handler)
+    log_listener.start()
+    return True
+
+
+def stop_logging() -> None:
+    """Drain LOG_QUEUE and detach it from the root logger."""
+    log_listener.stop()
+    logging.root.removeHandler(_queue_handler)
+
+# Set once the indexes exist, so later server instances in this process skip the round-trips
+_INDEXES_CREATED = False
+
+
+def create_indexes() -> None:
+    """Create optimized indexes, once per process."""
+    global _INDEXES_CREATED
+    if _INDEXES_CREATED:
+        return
+
+    try:
+        # Compound index; its timestamp prefix also covers day/month range queries
+        get_db()[SOLAR_COLLECTION].create_index([
+            ("timestamp", pymongo.DESCENDING),
+            ("client_id", pymongo.ASCENDING)
+        ])
+        _INDEXES_CREATED = True
+    except pymongo.errors.OperationFailure as e:
+        print(f"[!] Index creation error: {e}")
 
 
 class TCPSocketServer:
@@ -42,185 +110,296 @@ class TCPSocketServer:
         host: str = '0.0.0.0',
         port: int = 6000,
         heartbeat_packet: bytes = HEARTBEAT_PACKET,
-        response_packets: List[bytes] = RESPONSE_PACKETS
+        response_packets: List[bytes] = RESPONSE_PACKETS,
+        reuse_port: bool = False,
+        ensure_indexes: bool = True
     ):
         self.host = host
         self.port = port
+        self.reuse_port = reuse_port
         self.heartbeat_packet = heartbeat_packet
-        self.response_packets = response_packets
-        self.response_cycle = itertools.cycle(enumerate(self.response_packets))
-        self.cycle_lock = threading.Lock()
-        self.mongodb = MongoDBClient.get_db()
-        self.collections = {
-            'solar_data': self.mongodb['solar_data'],
-            'today_solar_data': self.mongodb['today_solar_data'],
-            'current_month_solar_data': self.mongodb['current_month_solar_data']
-        }
-        self._create_indexes()
-        self.mongo_lock = threading.Lock()
+        self._heartbeat_len = len(heartbeat_packet)
+        self.response_packets = tuple(response_packets)
+        self._responses = tuple(enumerate(self.response_packets))
+        if ensure_indexes:
+            create_indexes()
+        self._pending: List[dict] = []
+        self._flush_lock = threading.Lock()
+        self._flush_event = threading.Event()
+        # Handler tasks of the open connections, dropped explicitly at shutdown
+        self._connections: Set[asyncio.Task] = set()
 
-    
-    def _create_indexes(self) -> None:
-        """Create optimized indexes for each collection."""
-        try:
-            # TTL indexes
-            self.collections['today_solar_data'].create_index(
-                "timestamp",
-                expireAfterSeconds=86400  # 1 day
-            )
-            self.collections['current_month_solar_data'].create_index(
-                "timestamp",
-                expireAfterSeconds=2592000  # 30 days
-            )
-            # Compound index
-            self.collections['solar_data'].create_index([
-                ("timestamp", pymongo.DESCENDING),
-                ("client_id", pymongo.ASCENDING)
-            ])
-        except pymongo.errors.OperationFailure as e:
-            print(f"[!] Index creation error: {e}")
-
-
-    def _store_data(self, data: Dict[str, List[float]], client_id: str) -> None:
-        """Store data with thread-safe MongoDB operations."""
-        if len(data) != 3:
-            return
+
+    def _store_data(self, data: List[List[float]], client_id: str) -> None:
+        """Queue a sample for insertion; the flusher thread writes it."""
+        current, power, energy_consumption = data
             
-        now = datetime.now(pytz.utc)
+        now = datetime.now(timezone.utc)
 
         document = {
             "timestamp": now,
             "client_id": client_id,
-            "current": data.get("response_0", []),
-            "power": data.get("response_1", []),
-            "energy_consumption": data.get("response_2", []),
+            "current": current,
+            "power": power,
+            "energy_consumption": energy_consumption,
         }
         
+        with self._flush_lock:
+            self._pending.append(document)
+            batch_full = len(self._pending) >= BATCH_SIZE
+
+        logging.debug("[+] Data queued for MongoDB for %s at %s", client_id, now)
+        if batch_full:
+            self._flush_event.set()
+
+
+    def _flush(self) -> None:
+        """Swap out the pending batch and write it with one unordered insert_many."""
+        with self._flush_lock:
+            batch = self._pending
+            self._pending = []
+
+        if not batch:
+            return
         try:
-            with self.mongo_lock:
-                # Bulk insert/update
-                self.collections['solar_data'].insert_one(document)
-                self.collections['today_solar_data'].insert_one(document)
-                self.collections['current_month_solar_data'].insert_one(document)
-                
-            logging.info(f"[+] Data stored in all MongoDB collections for {client_id} at {now}")
-            
+            get_collection(SOLAR_COLLECTION).insert_many(batch, ordered=False)
         except pymongo.errors.PyMongoError as e:
-            logging.error(f"[!] MongoDB error for {client_id}: {e}")
+            logging.error(f"[!] MongoDB error flushing {len(batch)} documents into {SOLAR_COLLECTION}: {e}")
+
+
+    def _flush_periodically(self) -> None:
+        """Drain partial batches every FLUSH_INTERVAL, or sooner when one fills up."""
+        while True:
+            self._flush_event.wait(FLUSH_INTERVAL)
+            self._flush_event.clear()
+            self._flush()
 
 
     
-    def _process_response(self, index: int, hex_response: str) -> List[float]:
-        """Process the hex response with validation."""
-        if "0103" not in hex_response:
-            return []
+    def _process_response(self, index: int, response: bytes) -> List[float]:
+        """Decode the register values that follow the Modbus read header."""
+        # Well-formed Modbus/TCP frames carry the header at a fixed offset; only
+        # fall back to scanning for it when a device frames its reply differently
+        if response[MODBUS_HEADER_OFFSET:MODBUS_HEADER_OFFSET + 2] == MODBUS_READ_HEADER:
+            header_at = MODBUS_HEADER_OFFSET
+        else:
+            header_at = response.find(MODBUS_READ_HEADER)
+            if header_at == -1:
+                return []
             
         try:
-            _, payload = hex_response.split("0103", 1)
-            payload = payload[2:]  # Remove split residue
+            # Skip unit id, function code and byte count
+            payload = memoryview(response)[header_at + 3:]
             
-            chunk_size = 16 if index == 2 else 8
-            if len(payload) % chunk_size != 0:
+            unpacker = RESPONSE_DECODERS[index]
+            if len(payload) % unpacker.size != 0:
                 print(f"[!] Invalid payload length {len(payload)}")
                 return []
-            
-            chunks = [payload[i:i+chunk_size] 
-                     for i in range(0, len(payload), chunk_size)]
-            
-            converted_values = []
-            for chunk in chunks:
-                try:
-                    value = struct.unpack('!f' if chunk_size == 8 else '!q', 
-                                        bytes.fromhex(chunk))[0]
-                    converted_values.append(float(value))
-                except (struct.error, ValueError) as e:
-                    print(f"[!] Data unpacking error: {e}")
-            
-            return converted_values
+
+            if unpacker is FLOAT_STRUCT:
+                return [value for (value,) in unpacker.iter_unpack(payload)]
+            # float() keeps the int64 energy readings stored as doubles
+            return [float(value) for (value,) in unpacker.iter_unpack(payload)]
             
         except Exception as e:
             print(f"[!] Processing error: {e}")
             return []
 
 
-    def handle_client(self, client_socket: socket.socket, addr: Tuple[str, int]) -> None:
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
         """Handles a single client connection."""
-        client_id = f"{addr[0]}:{addr[1]}"
-        accumulated_data = {}
+        client_id = "unknown client"
+        # Values of responses #0-#2, by index, and how many of them have arrived
+        accumulated_data = [None, None, None]
+        received = 0
+        # Each connection walks its own request sequence, so no shared lock is needed
+        response_cycle = itertools.cycle(self._responses)
+        task = asyncio.current_task()
+        self._connections.add(task)
 
-        with client_socket:
-            client_socket.settimeout(CLIENT_TIMEOUT)
+        try:
+            addr = writer.get_extra_info('peername')
+            client_id = f"{addr[0]}:{addr[1]}"
+            logging.info(f"[+] New connection from {client_id}")
+            # Let the kernel reap half-open connections from devices that dropped off the network
+            writer.get_extra_info('socket').setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
 
-            try:
-                while True:
-                    data = client_socket.recv(RECV_BUFFER_SIZE)
-                    if not data:
-                        logging.info(f"[-] Client disconnected: {client_id}")
-                        break
+            while True:
+                data = await asyncio.wait_for(reader.read(RECV_BUFFER_SIZE), CLIENT_TIMEOUT)
+                if not data:
+                    logging.info(f"[-] Client disconnected: {client_id}")
+                    break
+
+                logging.debug("[←] Heartbeat received from %s: %s", client_id, data)
+
+                if len(data) == self._heartbeat_len and data == self.heartbeat_packet:
+                    index, response_packet = next(response_cycle)
+
+                    # Send response
+                    logging.debug("[→] Sending response #%d to %s", index, client_id)
+                    writer.write(response_packet)
+                    await writer.drain()
 
-                    logging.info(f"[←] Heartbeat received from {client_id}: {data}")
-
-                    if data == self.heartbeat_packet:
-                        # Get next response packet atomically
-                        with self.cycle_lock:
-                            index, response_packet = next(self.response_cycle)
-
-                        # Send response
-                        logging.info(f"[→] Sending response #{index} to {client_id}")
-                        client_socket.sendall(response_packet)
-
-                        # Wait for client response
-                        try:
-                            response = client_socket.recv(RECV_BUFFER_SIZE)
-                            if not response:
-                                logging.warning(f"[-] Client {client_id} disconnected after response")
-                                break
-                            
-                            hex_response = response.hex().upper()
-                            logging.info(f"[←] Response from {client_id}: {hex_response}")
-                            values = self._process_response(index, hex_response)
-                            if values:
-                                accumulated_data[f"response_{index}"] = values
-                                if len(accumulated_data) == 3:
-                                    self._store_data(accumulated_data, client_id)
-                                    accumulated_data = {}
-
-                        except (socket.timeout, socket.error):
-                            logging.warning(f"[!] Timeout waiting for response  from {client_id}")
+                    # Wait for client response
+                    try:
+                        response = await asyncio.wait_for(reader.read(RECV_BUFFER_SIZE), CLIENT_TIMEOUT)
+                        if not response:
+                            logging.warning(f"[-] Client {client_id} disconnected after response")
                             break
-                    else:
-                        logging.warning(f"[!] Unrecognized packet from {client_id}: {data}")
+                        
+                        if logging.root.isEnabledFor(logging.INFO):
+                            logging.info("[←] Response from %s: %s", client_id, response.hex().upper())
+                        values = self._process_response(index, response)
+                        if values:
+                            if accumulated_data[index] is None:
+                                received += 1
+                            accumulated_data[index] = values
+                            if received == 3:
+                                self._store_data(accumulated_data, client_id)
+                                accumulated_data = [None, None, None]
+                                received = 0
+
+                    except (asyncio.TimeoutError, OSError):
+                        logging.warning(f"[!] Timeout waiting for response  from {client_id}")
+                        break
+                else:
+                    logging.warning(f"[!] Unrecognized packet from {client_id}: {data}")
+
+        except asyncio.CancelledError:
+            # Shutdown: close quietly instead of leaving a cancelled task for asyncio to report
+            logging.debug("[-] Closing connection with %s on shutdown", client_id)
+        except asyncio.TimeoutError:
+            logging.warning(f"[!] Connection timeout with {client_id} ({CLIENT_TIMEOUT}s inactivity)")
+        except (OSError, ConnectionResetError, BrokenPipeError):
+            logging.error(f"[!] Connection lost with {client_id}")
+        except Exception as e:
+            logging.exception(f"[!] Error handling {client_id}: {e}")
+        finally:
+            self._connections.discard(task)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def _close_connections(self, server: asyncio.Server) -> None:
+        """Stop accepting and drop every open connection."""
+        # Since Python 3.12.1 leaving `async with server` waits for every client,
+        # and devices never hang up on their own while they keep sending heartbeats
+        server.close()
+        connections = tuple(self._connections)
+        for task in connections:
+            task.cancel()
+        await asyncio.gather(*connections, return_exceptions=True)
+
+    async def serve(self) -> None:
+        """Accepts connections on the event loop until SIGTERM or cancellation."""
+        # asyncio enables TCP_NODELAY on every accepted TCP socket, so Nagle
+        # never holds back the small Modbus requests
+        server = await asyncio.start_server(
+            self.handle_client, self.host, self.port,
+            backlog=LISTEN_BACKLOG, reuse_port=self.reuse_port
+        )
+        logging.info(f"[*] Server listening on {self.host}:{self.port}")
 
-            except socket.timeout:
-                logging.warning(f"[!] Connection timeout with {client_id} ({CLIENT_TIMEOUT}s inactivity)")
-            except (socket.error, ConnectionResetError, BrokenPipeError):
-                logging.error(f"[!] Connection lost with {client_id}")
-            except Exception as e:
-                logging.exception(f"[!] Error handling {client_id}: {e}")
+        stop = asyncio.Event()
+        # Return on SIGTERM so start_server still flushes the pending batch;
+        # signal handlers can only be installed from the main thread
+        if threading.current_thread() is threading.main_thread():
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+
+        async with server:
+            try:
+                await stop.wait()
+                logging.info("[*] Server shutdown requested. Exiting gracefully...")
+            finally:
+                await self._close_connections(server)
 
     def start_server(self) -> None:
         """Starts the TCP server and listens for connections."""
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server_socket:
-            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            server_socket.bind((self.host, self.port))
-            server_socket.listen(50)
-            logging.info(f"[*] Server listening on {self.host}:{self.port}")
+        owns_logging = start_logging()
+        threading.Thread(target=self._flush_periodically, daemon=True).start()
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            logging.info("\n[*] Server shutdown requested. Exiting gracefully...")
+        except Exception as e:
+            logging.exception(f"[!] Server error: {e}")
+        finally:
+            self._flush()
+            if owns_logging:
+                stop_logging()
 
-            try:
-                while True:
-                    client_socket, addr = server_socket.accept()
-                    logging.info(f"[+] New connection from {addr[0]}:{addr[1]}")
-                    threading.Thread(
-                        target=self.handle_client,
-                        args=(client_socket, addr),
-                        daemon=True
-                    ).start()
-            except KeyboardInterrupt:
-                logging.info("\n[*] Server shutdown requested. Exiting gracefully...")
-            except Exception as e:
-                logging.exception(f"[!] Server error: {e}")
+
+def _run_worker(host: str, port: int, log_queue: multiprocessing.Queue) -> None:
+    """Worker process: log through the parent's queue and serve on the shared port."""
+    # Shutdown is driven by the parent's terminate(), not a terminal Ctrl-C
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logging.root.setLevel(logging.INFO)
+    logging.root.handlers = [QueueHandler(log_queue)]
+    TCPSocketServer(host, port, reuse_port=True, ensure_indexes=False).start_server()
+
+
+def serve_workers(host: str = '0.0.0.0', port: int = 6000, workers: int = WORKERS) -> None:
+    """Runs one accept loop per process; the kernel spreads connections across them."""
+    # Indexes are created once here; the parent then drops its client, since only
+    # the workers write
+    create_indexes()
+    get_client().close()
+
+    # spawn, not fork: each worker must build its own MongoClient and connection pool
+    context = multiprocessing.get_context('spawn')
+    worker_log_queue = context.Queue(-1)
+    worker_log_listener = QueueListener(worker_log_queue, _stream_handler)
+    worker_log_listener.start()
+
+    processes = [
+        context.Process(target=_run_worker, args=(host, port, worker_log_queue), daemon=True)
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    logging.info(f"[*] Started {workers} worker processes on {host}:{port}")
+
+    def shutdown_handler(signum, frame):
+        logging.info("[*] Server shutdown requested. Stopping workers...")
+        for process in processes:
+            process.terminate()
+        deadline = time.monotonic() + WORKER_SHUTDOWN_TIMEOUT
+        for process in processes:
+            process.join(max(0, deadline - time.monotonic()))
+            if process.is_alive():
+                logging.error(f"[!] Worker {process.pid} did not exit within {WORKER_SHUTDOWN_TIMEOUT}s; killing it")
+                process.kill()
+                process.join()
+            elif process.exitcode != 0:
+                logging.warning(f"[!] Worker {process.pid} exited with code {process.exitcode}")
+
+    # Workers are only stopped through the parent, so they never outlive it
+    previous_handlers = {
+        signum: signal.signal(signum, shutdown_handler)
+        for signum in (signal.SIGINT, signal.SIGTERM)
+    }
+    try:
+        for process in processes:
+            process.join()
+    finally:
+        for signum, handler in previous_handlers.items():
+            signal.signal(signum, handler)
+        worker_log_listener.stop()
+
+
+def main() -> None:
+    owns_logging = start_logging()
+    try:
+        if WORKERS > 1:
+            serve_workers()
+        else:
+            TCPSocketServer().start_server()
+    finally:
+        if owns_logging:
+            stop_logging()
 
 
 if __name__ == "__main__":
-    server = TCPSocketServer()
-    server.start_server()
+    main()
@@ -1,3 +1,46 @@
-from django.test import TestCase
+import struct
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from solar.tcp_socket_server.server import RESPONSE_PACKETS, TCPSocketServer
+
+
+def modbus_reply(index, body):
+    """Frames a read-holding-registers reply the way the meter does, MBAP header included."""
+    mbap = RESPONSE_PACKETS[index][:4] + struct.pack('!H', len(body) + 3)
+    return mbap + b'\x01\x03' + bytes([len(body)]) + body
+
+
+class ProcessResponseTests(SimpleTestCase):
+    def setUp(self):
+        self.server = TCPSocketServer(ensure_indexes=False)
+
+    def test_modbus_tcp_reply(self):
+        currents = [1.5, 2.25, -3.0, 0.0, 12.5]
+        response = modbus_reply(0, struct.pack('!5f', *currents))
+
+        self.assertEqual(self.server._process_response(0, response), currents)
+
+    def test_reply_without_mbap_header_is_scanned(self):
+        power = [100.5, 200.25, 300.0]
+        body = struct.pack('!3f', *power)
+        response = b'\x01\x03' + bytes([len(body)]) + body
+
+        self.assertEqual(self.server._process_response(1, response), power)
+
+    def test_bad_payload_length(self):
+        response = modbus_reply(0, struct.pack('!5f', 1.0, 2.0, 3.0, 4.0, 5.0)[:-1])
+
+        self.assertEqual(self.server._process_response(0, response), [])
+
+    def test_missing_read_header(self):
+        self.assertEqual(self.server._process_response(0, b'\x00' * 12), [])
+
+    def test_int64_energy_values(self):
+        energy = [123456789012, 42]
+        response = modbus_reply(2, struct.pack('!2q', *energy))
+
+        values = self.server._process_response(2, response)
+
+        self.assertEqual(values, [123456789012.0, 42.0])
+        self.assertTrue(all(type(value) is float for value in values))